@@ -264,12 +264,15 @@ def main():
 			nnxo = 0
 			fq   = 0.0
 			pixel_size = 1.0
-		nnxo = bcast_number_to_all(nnxo, source_node = main_node)
+		#  one broadcast of the three scalars instead of three collectives
+		from mpi import MPI_FLOAT
+		hdrbuf     = mpi_bcast([nnxo, pixel_size, fq], 3, MPI_FLOAT, main_node, MPI_COMM_WORLD)
+		nnxo       = int(hdrbuf[0])
+		pixel_size = float(hdrbuf[1])
+		fq         = float(hdrbuf[2])
 		if( nnxo < 0 ):
 			mpi_finalize()
 			exit()
-		pixel_size                           = bcast_number_to_all(pixel_size, source_node = main_node)
-		fq                                   = bcast_number_to_all(fq, source_node = main_node)
 		if Tracker["constants"]["wn"]==0:
 			Tracker["constants"]["nnxo"] = nnxo
 		else:
@@ -288,24 +291,13 @@ def main():
 			if masterdir =="":
 				timestring = strftime("_%d_%b_%Y_%H_%M_%S", localtime())
 				masterdir ="master_sort3d"+timestring
-				li =len(masterdir)
-			else:
-				li = 0
-			cmd="{} {}".format("mkdir", masterdir)
-			os.system(cmd)			
-		else:
-			li=0
-		li = mpi_bcast(li,1,MPI_INT,main_node,MPI_COMM_WORLD)[0]
-		if li>0:
-			masterdir = mpi_bcast(masterdir,li,MPI_CHAR,main_node,MPI_COMM_WORLD)
-			masterdir = string.join(masterdir,"")
+			os.makedirs(masterdir, exist_ok = True)
+		masterdir = wrap_mpi_bcast(masterdir, main_node)
 		####--- masterdir done!
 		if myid ==main_node:
 			print_dict(Tracker["constants"],"Permanent settings of 3-D sorting program")
-		from time import sleep
-		while not os.path.exists(masterdir):  # Be sure each proc is able to access the created dir
-				print("Node ",myid,"  waiting...")
-				sleep(5)
+		#  the main node created the directory before the name was broadcast,
+		#  so a barrier is enough - no need to poll the file system
 		mpi_barrier(MPI_COMM_WORLD)
 		######### create a vstack from input stack to the local stack in masterdir
 		# stack name set to default
@@ -327,25 +319,6 @@ def main():
 		else:
 			total_stack =0
 		total_stack = bcast_number_to_all(total_stack, source_node = main_node)
-		"""
-		if myid==main_node:
-	   		from EMAN2db import db_open_dict	
-	   		OB = db_open_dict(orgstack)
-	   		DB = db_open_dict(Tracker["constants"]["stack"]) 
-			for i in xrange(total_stack):
-				DB[i] = OB[i]
-			OB.close()
-			DB.close()
-	   	mpi_barrier(MPI_COMM_WORLD)
-	   	if myid==main_node:
-			params= []
-			for i in xrange(total_stack):
-				e=get_im(orgstack,i)
-				phi,theta,psi,s2x,s2y = get_params_proj(e)
-				params.append([phi,theta,psi,s2x,s2y])
-			write_text_row(params,Tracker["constants"]["ali3d"])
-		mpi_barrier(MPI_COMM_WORLD)
-		"""
 		#Tracker["total_stack"]             = total_stack
 		Tracker["constants"]["total_stack"] = total_stack
 		Tracker["shrinkage"]                = float(Tracker["nxinit"])/Tracker["constants"]["nnxo"]
@@ -408,21 +381,27 @@ def main():
 			chunk_one = wrap_mpi_bcast(chunk_one, main_node)
 			chunk_two = wrap_mpi_bcast(chunk_two, main_node)
 		else:  ## if traces are lost, then creating new random assignment of odd, even particles
-			chunks = list(range(Tracker["constants"]["total_stack"]))
-			shuffle(chunks)
-			chunk_one =chunks[0:Tracker["constants"]["total_stack"]//2]
-			chunk_two =chunks[Tracker["constants"]["total_stack"]//2:Tracker["constants"]["total_stack"]]
-			chunk_one = wrap_mpi_bcast(chunk_one, main_node)	
-			chunk_two = wrap_mpi_bcast(chunk_two, main_node)	
+			import numpy
+			# one C-level permutation on the main node instead of a python shuffle on every rank
+			if myid == main_node:
+				perm      = numpy.random.permutation(Tracker["constants"]["total_stack"])
+				chunk_one = perm[0:Tracker["constants"]["total_stack"]//2].tolist()
+				chunk_two = perm[Tracker["constants"]["total_stack"]//2:Tracker["constants"]["total_stack"]].tolist()
+			else:
+				chunk_one = 0
+				chunk_two = 0
+			chunk_one = wrap_mpi_bcast(chunk_one, main_node)
+			chunk_two = wrap_mpi_bcast(chunk_two, main_node)
 				
 		###### Fill chunk ID into headers when calling get_shrink_data_huang
 		if myid ==main_node:
 			print(" random odd and even assignment done  !")
 		mpi_barrier(MPI_COMM_WORLD)
 		#------------------------------------------------------------------------------
-		Tracker["chunk_dict"] = {}
-		for element in chunk_one: Tracker["chunk_dict"][element] = 0
-		for element in chunk_two: Tracker["chunk_dict"][element] = 1
+		import numpy
+		# dense int8 table over the full stack instead of a python dict
+		Tracker["chunk_dict"] = numpy.zeros(Tracker["constants"]["total_stack"], dtype = numpy.int8)
+		Tracker["chunk_dict"][numpy.asarray(chunk_two, dtype = numpy.int64)] = 1
 		Tracker["P_chunk0"]   = len(chunk_one)/float(Tracker["constants"]["total_stack"])
 		Tracker["P_chunk1"]   = len(chunk_two)/float(Tracker["constants"]["total_stack"])
 		### create two volumes to estimate resolution
@@ -447,9 +426,10 @@ def main():
 			low_pass    =0.0
 			falloff     =0.0
 			currentres  =0.0
-		currentres                    = bcast_number_to_all(currentres,source_node = main_node)
-		low_pass                      = bcast_number_to_all(low_pass,source_node   = main_node)
-		falloff                       = bcast_number_to_all(falloff,source_node    = main_node)
+		#  one broadcast of the three scalars instead of three collectives
+		from mpi import MPI_FLOAT
+		resbuf                        = mpi_bcast([currentres, low_pass, falloff], 3, MPI_FLOAT, main_node, MPI_COMM_WORLD)
+		currentres, low_pass, falloff = float(resbuf[0]), float(resbuf[1]), float(resbuf[2])
 		Tracker["currentres"]         = currentres
 		
 		####################################################################
@@ -557,8 +537,7 @@ def main():
 				P2_run_dir = os.path.join(masterdir, "P2_run%d"%iter_P2_run)
 				Tracker["number_of_groups"] = get_number_of_groups(total_stack, Tracker["constants"]["number_of_images_per_group"])
 				if myid == main_node:
-					cmd="{} {}".format("mkdir", P2_run_dir)
-					os.system(cmd)
+					os.makedirs(P2_run_dir, exist_ok = True)
 					log_main.add("----------------P2 independent run %d--------------"%iter_P2_run)
 					log_main.add("user provided number_of_images_per_group %d"%Tracker["constants"]["number_of_images_per_group"])
 					print("----------------P2 independent run %d--------------"%iter_P2_run)
@@ -577,8 +556,7 @@ def main():
 					Tracker["this_dir"] = workdir
 					
 					if myid ==main_node:
-						cmd="{} {}".format("mkdir", workdir)
-						os.system(cmd)
+						os.makedirs(workdir, exist_ok = True)
 						log_main.add("---- generation         %5d"%generation)
 						log_main.add("number of images per group is set as %d"%Tracker["constants"]["number_of_images_per_group"])
 						log_main.add("the initial number of groups is  %d "%Tracker["number_of_groups"])
@@ -627,9 +605,10 @@ def main():
 						ref_vol_list.append(volref)
 						number_of_ref_class.append(len(Tracker["this_data_list"]))
 					if myid ==main_node:
-						log_main.add("group  %d  members %d "%(igrp,len(Tracker["this_data_list"])))	
+						log_main.add("group  %d  members %d "%(igrp,len(Tracker["this_data_list"])))
 						#ref_vol_list=apply_low_pass_filter(ref_vol_list,Tracker)
-						for iref in range(len(ref_vol_list)): ref_vol_list[iref].write_image(os.path.join(workdir,"vol_stable.hdf"),iref)
+						vol_stable_file = os.path.join(workdir,"vol_stable.hdf")
+						for iref in range(len(ref_vol_list)): ref_vol_list[iref].write_image(vol_stable_file,iref)
 						
 					mpi_barrier(MPI_COMM_WORLD)
 					################################
@@ -648,11 +627,11 @@ def main():
 					if myid == main_node:
 						number_of_ref_class=[]
 						log_main.add(" Compute volumes of original size")
+						#  the class lists returned by ali3d_mref_Kmeans_MPI are already
+						#  in memory, so there is no need to re-read the Class files
 						for igrp in range(Tracker["number_of_groups"]):
-							if os.path.exists( os.path.join( outdir,"Class%d.txt"%igrp ) ):
-								new_stable1.append( read_text_file( os.path.join( outdir, "Class%d.txt"%igrp ) ) )
-								log_main.add(" read Class file %d"%igrp)
-								number_of_ref_class.append(len(new_stable1))
+							new_stable1.append( res_classes[igrp] )
+							number_of_ref_class.append(len(new_stable1))
 					else:  number_of_ref_class = 0
 					number_of_ref_class = wrap_mpi_bcast(number_of_ref_class,main_node)
 					
@@ -674,8 +653,11 @@ def main():
 					#################################
 					
 					if myid ==main_node:
-						for ivol in range(len(vol_list)): vol_list[ivol].write_image(os.path.join(workdir, "vol_of_Classes.hdf"),ivol)
-						filt_tanl(vol_list[ivol],Tracker["constants"]["low_pass_filter"],.1).write_image(os.path.join(workdir, "volf_of_Classes.hdf"),ivol)
+						vol_classes_file  = os.path.join(workdir, "vol_of_Classes.hdf")
+						volf_classes_file = os.path.join(workdir, "volf_of_Classes.hdf")
+						for ivol in range(len(vol_list)):
+							vol_list[ivol].write_image(vol_classes_file,ivol)
+							filt_tanl(vol_list[ivol],Tracker["constants"]["low_pass_filter"],.1).write_image(volf_classes_file,ivol)
 						log_main.add("number of unaccounted particles  %10d"%len(Tracker["this_unaccounted_list"]))
 						log_main.add("number of accounted particles  %10d"%len(Tracker["this_accounted_list"]))
 						del vol_list
@@ -793,17 +775,25 @@ def main():
 					mpi_finalize()
 					exit()
 				mpi_barrier(MPI_COMM_WORLD)
-				fscc        = read_text_file(os.path.join(masterdir, "resolution_%02d.txt"%igrp),-1)
 				nx_of_image = volref.get_xsize()
 				if Tracker["constants"]["PWadjustment"]:	Tracker["PWadjustment"] = Tracker["PW_dict"][nx_of_image]
-				else:										Tracker["PWadjustment"] = Tracker["constants"]["PWadjustment"]	
-				try:
-					lowpass = search_lowpass(fscc)
-					falloff = 0.1
-				except:
-					lowpass= 0.4
-					falloff= 0.1
-				print(lowpass)
+				else:										Tracker["PWadjustment"] = Tracker["constants"]["PWadjustment"]
+				#  only the main node holds the real volume, so read the fsc text
+				#  and search the cutoff there and broadcast the two numbers
+				if myid == main_node:
+					fscc = read_text_file(os.path.join(masterdir, "resolution_%02d.txt"%igrp),-1)
+					try:
+						lowpass = search_lowpass(fscc)
+						falloff = 0.1
+					except:
+						lowpass= 0.4
+						falloff= 0.1
+					print(lowpass)
+				else:
+					lowpass = 0.0
+					falloff = 0.0
+				lowpass = bcast_number_to_all(lowpass, source_node = main_node)
+				falloff = bcast_number_to_all(falloff, source_node = main_node)
 				lowpass=round(lowpass,4)
 				falloff=round(min(.1,falloff),4)
 				Tracker["lowpass"]= lowpass
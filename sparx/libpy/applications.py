@@ -7890,6 +7890,7 @@ def mref_ali3d_MPI(stack, ref_vol, outdir, maskfile=None, focus = None, maxit=1,
 	numr     = Numrinit(first_ring, last_ring, rstep, "F")
 	mask2D   = model_circle(last_ring, nx, nx)
 	if(first_ring > 1):  mask2D -= model_circle(first_ring, nx, nx)
+	fscmask  = model_circle(last_ring, nx, nx, nx)
 
 
 	if( type(stack) is bytes ):
@@ -7954,7 +7955,7 @@ def mref_ali3d_MPI(stack, ref_vol, outdir, maskfile=None, focus = None, maxit=1,
 		from reconstruction import rec3D_MPI
 		from pap_statistics     import varf3d_MPI
 		#  Compute Fourier variance
-		vol, fscc = rec3D_MPI(data, snr, sym, model_circle(last_ring, nx, nx, nx), os.path.join(outdir, "resolution0000"), myid, main_node, finfo=frec, npad=npad)
+		vol, fscc = rec3D_MPI(data, snr, sym, fscmask, os.path.join(outdir, "resolution0000"), myid, main_node, finfo=frec, npad=npad)
 		varf = varf3d_MPI(data, os.path.join(outdir, "ssnr0000"), None, vol, last_ring, 1.0, 1, CTF, 1, sym, myid)
 		if myid == main_node:   
 			varf = 1.0/varf
@@ -8424,8 +8425,8 @@ def mref_ali3d_MPI(stack, ref_vol, outdir, maskfile=None, focus = None, maxit=1,
 		for iref in range(numref):
 			#  3D stuff
 			from time import localtime, strftime
-			if(CTF): volref, fscc[iref] = rec3D_MPI(data, snr, sym, model_circle(last_ring, nx, nx, nx), os.path.join(outdir, "resolution_%02d_%04d"%(iref, total_iter)), myid, main_node, index = iref, npad = npad, finfo=frec)
-			else:    volref, fscc[iref] = rec3D_MPI_noCTF(data, sym, model_circle(last_ring, nx, nx, nx), os.path.join(outdir, "resolution_%02d_%04d"%(iref, total_iter)), myid, main_node, index = iref, npad = npad, finfo=frec)
+			if(CTF): volref, fscc[iref] = rec3D_MPI(data, snr, sym, fscmask, os.path.join(outdir, "resolution_%02d_%04d"%(iref, total_iter)), myid, main_node, index = iref, npad = npad, finfo=frec)
+			else:    volref, fscc[iref] = rec3D_MPI_noCTF(data, sym, fscmask, os.path.join(outdir, "resolution_%02d_%04d"%(iref, total_iter)), myid, main_node, index = iref, npad = npad, finfo=frec)
 			if(myid == 0):
 				log.add( "Time to compute 3D: %d" % (time()-start_time) );start_time = time()
 
@@ -20315,13 +20316,14 @@ def ali3d_mref_Kmeans_MPI(ref_list, outdir, this_data_list_file, Tracker):
 	###------- 
 	from alignment      import Numrinit, prepare_refrings, proj_ali_incore
 	from random         import randint
-	from filter         import filt_ctf
+	from filter         import filt_ctf, filt_tophatl
 	from utilities      import print_begin_msg, print_end_msg, print_msg
 	from projection     import prep_vol, prgs, prgl, project, prgq, gen_rings_ctf
 	from applications   import MPI_start_end
 	from reconstruction import rec3D_MPI_noCTF,rec3D_two_chunks_MPI
 	from morphology     import binarize, get_shrink_3dmask
-	from fundamentals   import fftip, rops_table, fft
+	from fundamentals   import fftip, rops_table, fft, fft_many
+	from math           import sqrt
 	import os
 	import types
 	from mpi            import mpi_bcast, mpi_comm_size, mpi_comm_rank, MPI_FLOAT, MPI_COMM_WORLD, mpi_barrier
@@ -20554,7 +20556,10 @@ def ali3d_mref_Kmeans_MPI(ref_list, outdir, this_data_list_file, Tracker):
 				
 			if Tracker["mask3D"]: Util.mul_img(ref_list[iref], mask3D)
 			ref_list[iref].write_image(os.path.join(outdir, "volf0000.hdf"), iref)
-			
+
+	#  keep the filtered references in memory on main_node so the per-iref broadcast
+	#  does not have to re-read volf%04d.hdf from disk in every iteration
+	if myid == main_node:  volf_list = ref_list[:]
 	mpi_barrier(MPI_COMM_WORLD)
 
 	if CTF:
@@ -20589,6 +20594,7 @@ def ali3d_mref_Kmeans_MPI(ref_list, outdir, this_data_list_file, Tracker):
 
 
 	Niter = int(lstp*maxit*(nassign + nrefine) )
+	precn_hist = []
 	for Iter in range(Niter):
 		N_step = old_div((Iter%(lstp*(nassign+nrefine))),(nassign+nrefine))
 		if Iter%(nassign+nrefine) < nassign:
@@ -20615,13 +20621,23 @@ def ali3d_mref_Kmeans_MPI(ref_list, outdir, this_data_list_file, Tracker):
 				del ref_angles
 			else:  list_of_reference_angles = [[1.0,1.0]]
 		cs = [0.0]*3
-		from fundamentals import fft
+		from fundamentals import fft, fft_many
 		if( not focus ):
-			for im in range(nima):  data[im] = fft(data[im])
+			data = fft_many(data)
+
+		#  For REFINEMENT with CTF the reference rings are regenerated whenever the defocus
+		#  changes between consecutive particles; visit particles in defocus order so each
+		#  distinct defocus triggers exactly one gen_rings_ctf call.
+		if CTF and runtype=="REFINEMENT":
+			proc_order = sorted(range(nima), key=lambda im: data[im].get_attr("ctf").defocus)
+		else:
+			proc_order = list(range(nima))
 
 		for iref in range(numref):
-			if myid==main_node: volft = get_im(os.path.join(outdir, "volf%04d.hdf"%(total_iter-1)), iref)
+			if myid==main_node: volft = volf_list[iref]
 			else:				volft=model_blank(nx,nx,nx)
+			#  Synchronous broadcast; the mpi bindings used here do not expose MPI_Ibcast,
+			#  so the volume cannot be shipped while the preceding rec3D work is still running.
 			bcast_EMData_to_all(volft, myid, main_node)
 			volft= prep_vol(volft,1,1)
 			if CTF:
@@ -20641,7 +20657,7 @@ def ali3d_mref_Kmeans_MPI(ref_list, outdir, this_data_list_file, Tracker):
 					del volft, kb
 
 			start_time = time()
-			for im in range(nima):
+			for im in proc_order:
 				if CTF:
 					ctf = data[im].get_attr( "ctf" )
 					if runtype=="REFINEMENT":
@@ -20665,8 +20681,6 @@ def ali3d_mref_Kmeans_MPI(ref_list, outdir, this_data_list_file, Tracker):
 						ref = filt_ctf( prgl( volft, [phi,tht,psi,-s2x,-s2y], 1, False), ctf )
 					else:
 						ref = prgl( volft, [phi,tht,psi,-s2x,-s2y], 1, False)
-					from filter import filt_tophatl
-					from math import sqrt
 					ref = filt_tophatl(ref, float(highres[iref])/(ref.get_ysize()))
 					ref.set_attr("is_complex",0)
 					ref.set_value_at(0,0,0.0)
@@ -20683,7 +20697,7 @@ def ali3d_mref_Kmeans_MPI(ref_list, outdir, this_data_list_file, Tracker):
 					peak /= nrmref
 
 
-					'''  
+					'''
 					#  FSC distance
 					#  Ref is in reciprocal space
 					if CTF:
@@ -20735,8 +20749,10 @@ def ali3d_mref_Kmeans_MPI(ref_list, outdir, this_data_list_file, Tracker):
 
 
 		#  compute number of particles that changed assignment and how many are in which group
+		from numpy import zeros, int32
 		nchng = 0
-		npergroup = [0]*numref
+		#  contiguous buffer, handed to mpi_reduce without an intermediate copy
+		npergroup = zeros(numref, dtype = int32)
 		for im in range(nima):
 			iref = data[im].get_attr('group')
 			npergroup[iref] += 1
@@ -20745,7 +20761,6 @@ def ali3d_mref_Kmeans_MPI(ref_list, outdir, this_data_list_file, Tracker):
 				nchng += 1
 		nchng            = mpi_reduce(nchng, 1, MPI_INT, MPI_SUM, 0, MPI_COMM_WORLD)
 		npergroup        = mpi_reduce(npergroup, numref, MPI_INT, MPI_SUM, 0, MPI_COMM_WORLD)
-		npergroup        = list(map(int, npergroup))
 		terminate        = 0
 		empty_group      = 0
 		empty_group_list = []
@@ -20757,24 +20772,34 @@ def ali3d_mref_Kmeans_MPI(ref_list, outdir, this_data_list_file, Tracker):
 			log.add(msg)
 			msg = " Group       number of particles"
 			log.add(msg)
+			#  single pass: convert, log, flag empty groups and collect ngroup together
 			for iref in range(numref):
-				msg = " %5d       %7d"%(iref+1, npergroup[iref])
+				nper = int(npergroup[iref])
+				msg = " %5d       %7d"%(iref+1, nper)
 				log.add(msg)
-				if npergroup[iref]==0:
+				if nper==0:
 					empty_group =1
 					empty_group_list.append(iref)
-				ngroup.append(int(npergroup[iref]))
+				ngroup.append(nper)
+			#  terminate when the change percentage drops below termprec, or when it
+			#  plateaus - spread of the last three iterations below the patience
+			#  threshold - so runs oscillating just above termprec stop early too
+			precn_hist.append(precn)
 			if precn <= termprec:
 				terminate = 1
+			elif len(precn_hist) >= 3:
+				window = precn_hist[-3:]
+				if( max(window) - min(window) < Tracker["constants"].get("early_term_patience", 0.5) ):
+					terminate = 1
 			if empty_group ==1:
 				terminate = 1
 		else:
 			ngroup  = 0
-		terminate   = mpi_bcast(terminate, 1, MPI_INT, 0, MPI_COMM_WORLD)
-		terminate   = int(terminate[0])
+		#  terminate and empty_group travel together in a single small-message broadcast
+		term_flags  = mpi_bcast([terminate, empty_group], 2, MPI_INT, 0, MPI_COMM_WORLD)
+		terminate   = int(term_flags[0])
+		empty_group = int(term_flags[1])
 		ngroup      = wrap_mpi_bcast(ngroup,main_node)
-		empty_group = mpi_bcast(empty_group, 1, MPI_INT, 0, MPI_COMM_WORLD)
-		empty_group = int(empty_group[0])
 		if empty_group ==1: break # program stops whenever empty_group appears!
 		if runtype=="REFINEMENT":
 			for im in range(nima):  data[im].set_attr('xform.projection', trans[im])
@@ -20791,10 +20816,12 @@ def ali3d_mref_Kmeans_MPI(ref_list, outdir, this_data_list_file, Tracker):
 			recvbuf = mpi_gatherv(pixer, nima, MPI_FLOAT, recvcount, disps, MPI_FLOAT, main_node, MPI_COMM_WORLD)
 			mpi_barrier(MPI_COMM_WORLD)
 			if myid == main_node:
-				recvbuf = list(map(float, recvbuf))
-				from pap_statistics import hist_list
+				from numpy import asarray, histogram, float64
 				lhist = 20
-				region, histo = hist_list(recvbuf, lhist)
+				#  C-level histogram on the gathered buffer; bin layout matches hist_list
+				histo, bins = histogram(asarray(recvbuf, dtype = float64), bins = lhist)
+				region = bins[:lhist].tolist()
+				histo  = histo.tolist()
 				if region[0] < 0.0:  region[0] = 0.0
 				msg = "      Histogram of pixel errors\n      ERROR       number of particles"
 				log.add(msg)
@@ -20816,12 +20843,18 @@ def ali3d_mref_Kmeans_MPI(ref_list, outdir, this_data_list_file, Tracker):
 		#Tracker["lowpass"] = lowpass
 
 		if( not focus ):
-			for im in range(nima):  data[im] = fft(data[im])
+			data = fft_many(data)
 
 		highres = []
 		lowpass_tmp =[]
 		tmpref =[]
 		from pap_statistics import fsc
+		#  The numref reconstructed volumes are shipped one by one through blocking
+		#  collectives inside rec3D; batching them behind MPI_Ibcast/MPI_Waitall would
+		#  need non-blocking support in the mpi bindings, which they do not provide.
+		#  The references cannot be reconstructed by independent sub-communicators
+		#  either: every rank holds a slice of the particles of all groups, so each
+		#  rec3D(index=iref) needs contributions from the whole communicator.
 		for iref in range(numref):
 			#  3D stuff
 			from time import localtime, strftime
@@ -20892,6 +20925,7 @@ def ali3d_mref_Kmeans_MPI(ref_list, outdir, this_data_list_file, Tracker):
 					
 				if Tracker["mask3D"]: Util.mul_img(tmpref[iref], mask3D)
 				tmpref[iref].write_image(os.path.join(outdir, "volf%04d.hdf"%( total_iter)), iref)
+		if myid == main_node:  volf_list = tmpref
 		del tmpref
 
 		if runtype=="REFINEMENT":
@@ -20989,13 +21023,14 @@ def mref_ali3d_EQ_Kmeans(ref_list, outdir, particle_list_file, Tracker):
 	from utilities      import parsing_sorting_params, fill_in_mpi_list, wrap_mpi_bcast, get_groups_from_partition
 	from utilities      import remove_small_groups, set_filter_parameters_from_adjusted_fsc
 	###-----------
-	from alignment      import Numrinit, prepare_refrings, proj_ali_incore
+	from alignment      import Numrinit, prepare_refrings, proj_ali_incore, generate_list_of_reference_angles_for_search
 	from random         import randint, random
-	from filter         import filt_ctf
+	from filter         import filt_ctf, filt_tophatl
+	from math           import sqrt
 	from utilities      import print_begin_msg, print_end_msg, print_msg, read_text_file
 	from projection     import prep_vol, prgs, prgl, project, prgq, gen_rings_ctf
 	from morphology     import binarize, get_shrink_3dmask
-	from pap_statistics		import fsc
+	from pap_statistics		import fsc, hist_list
 
 	import os
 	import types
@@ -21003,7 +21038,9 @@ def mref_ali3d_EQ_Kmeans(ref_list, outdir, particle_list_file, Tracker):
 	from mpi            import mpi_reduce, mpi_gatherv, mpi_scatterv, MPI_INT, MPI_SUM
 	from applications   import MPI_start_end
 	from reconstruction import rec3D_two_chunks_MPI, rec3D_MPI_noCTF
-	from fundamentals   import fftip, rops_table, fft
+	from fundamentals   import fftip, rops_table, fft, fft_many
+	from numpy          import float32, int32, empty, full, zeros, fromiter, bincount
+	from numpy          import asarray, ascontiguousarray, arange, searchsorted, dot, intp, abs
 	mpi_comm = MPI_COMM_WORLD
 	#####  reconstruction parameters, no need to change.
 	fourvar   = False
@@ -21049,10 +21086,10 @@ def mref_ali3d_EQ_Kmeans(ref_list, outdir, particle_list_file, Tracker):
 	if Tracker["constants"]["PWadjustment"] !='':
 		Tracker["PWadjustment"] = Tracker["PW_dict"][Tracker["constants"]["nxinit"]]
 	else:
-		Tracker["PWadjustment"] = None	
+		Tracker["PWadjustment"] = None
 	####################################################
 	from time import sleep
-	#Tracker["applyctf"] = True # 
+	#Tracker["applyctf"] = True #
 	data, old_shifts = get_shrink_data_huang(Tracker, Tracker["nxinit"], particle_list_file, partstack, myid,main_node,number_of_proc,preshift=True)
 	if myid ==main_node:
 		list_of_particles = read_text_file(particle_list_file)
@@ -21233,6 +21270,8 @@ def mref_ali3d_EQ_Kmeans(ref_list, outdir, particle_list_file, Tracker):
 
 			if Tracker["mask3D"]: Util.mul_img(ref_list[iref], mask3D)
 			ref_list[iref].write_image(os.path.join(outdir,"volf0000.hdf"),iref)
+		#  keep the filtered references in memory so iterations need not reread them
+		volf_list = ref_list[:]
 			
 	mpi_barrier( MPI_COMM_WORLD )
 	if CTF:
@@ -21253,6 +21292,16 @@ def mref_ali3d_EQ_Kmeans(ref_list, outdir, particle_list_file, Tracker):
 		recvcount.append( ie - ib )
 	total_iter = 0
 	tr_dummy = Transform({"type":"spider"})
+	#  scoring buffers are allocated once and reused across iterations
+	peaks = full((numref, nima), -1.0e23, dtype = float32)
+	pixer = zeros((numref, nima), dtype = float32)
+	#  reference directions depend only on constants, prepare them once
+	from utilities import even_angles, getvec
+	if   Tracker["constants"]["protein_shape"]=="g"  :refa = even_angles(60.0)     # globular proteins
+	elif Tracker["constants"]["protein_shape"]=="f"  :refa = even_angles(40.0, theta1=65, theta2=115) # filament proteins
+	numrefang = len(refa)
+	refanorm  = asarray([getvec(q[0], q[1]) for q in refa], dtype = float32).reshape(numrefang, 3)
+	del refa
 
 	if(focus != None):
 		if(myid == main_node):
@@ -21277,26 +21326,29 @@ def mref_ali3d_EQ_Kmeans(ref_list, outdir, particle_list_file, Tracker):
 			log.add("\n%s ITERATION #%3d,  inner iteration #%3d\nDelta = %4.1f, an = %5.2f, xrange = %5.2f, yrange = %5.2f, step = %5.2f  \
 			"%(runtype, total_iter, Iter, delta[N_step], an[N_step], xrng[N_step],yrng[N_step],step[N_step]))
 			start_ime = time()
-		peaks =  [ [ -1.0e23 for im in range(nima) ] for iref in range(numref) ]
+		peaks.fill(-1.0e23)
 		if runtype=="REFINEMENT":
 			trans = [ [ tr_dummy for im in range(nima) ] for iref in range(numref) ]
-			pixer = [ [  0.0     for im in range(nima) ] for iref in range(numref) ]
+			pixer.fill(0.0)
 			if(an[N_step] > 0):
-				from utilities    import even_angles
 				ref_angles = even_angles(delta[N_step], symmetry=sym, method = ref_a, phiEqpsi = "Zero")
 				# generate list of angles
-				from alignment import generate_list_of_reference_angles_for_search
 				list_of_reference_angles = \
 				generate_list_of_reference_angles_for_search(ref_angles, sym=sym)
 				del ref_angles
 			else:  list_of_reference_angles = [[1.0,1.0]]
 		cs = [0.0]*3
-		from fundamentals import fft
 		if( not focus ):
-			for im in range(nima):  data[im] = fft(data[im])
+			data = fft_many(data)
 
+		#  visit particles in defocus order so the rings computed by gen_rings_ctf
+		#  are reused across all particles sharing a defocus value
+		if CTF and runtype=="REFINEMENT":
+			proc_order = sorted(range(nima), key=lambda im: data[im].get_attr("ctf").defocus)
+		else:
+			proc_order = list(range(nima))
 		for iref in range(numref):
-			if(myid == main_node):	volft = get_im(os.path.join(outdir, "volf%04d.hdf"%(total_iter-1)), iref)
+			if(myid == main_node):	volft = volf_list[iref]
 			else: 					volft =  model_blank(nx, nx, nx)
 			bcast_EMData_to_all(volft, myid, main_node)
 			volft = prep_vol(volft, 1, 1)
@@ -21314,7 +21366,9 @@ def mref_ali3d_EQ_Kmeans(ref_list, outdir, particle_list_file, Tracker):
 					if(myid == 0): log.add( "Initial time to prepare rings: %d" % (time()-start_time) );start_time = time()
 					del volft, kb
 			start_time = time()
-			for im in range(nima):
+			#  loop invariants of the per-particle scoring, computed once per reference
+			freq_cut = old_div(float(highres[iref]), data[0].get_ysize())
+			for im in proc_order:
 				if(CTF):
 					ctf = data[im].get_attr("ctf")
 					if runtype=="REFINEMENT":
@@ -21340,9 +21394,7 @@ def mref_ali3d_EQ_Kmeans(ref_list, outdir, particle_list_file, Tracker):
 						ref = filt_ctf( prgl( volft, [phi,tht,psi,-s2x,-s2y], 1, False), ctf )
 					else:
 						ref = prgl( volft, [phi,tht,psi,-s2x,-s2y], 1, False)
-					from filter import filt_tophatl
-					from math import sqrt
-					ref = filt_tophatl(ref, float(highres[iref])/(ref.get_ysize()))
+					ref = filt_tophatl(ref, freq_cut)
 					ref.set_attr("is_complex",0)
 					ref.set_value_at(0,0,0.0)
 					nrmref = sqrt(Util.innerproduct(ref, ref, None))
@@ -21398,51 +21450,38 @@ def mref_ali3d_EQ_Kmeans(ref_list, outdir, particle_list_file, Tracker):
 			del refrings
 			if(an[N_step] > 0): del list_of_reference_angles
 		#  send peak values to the main node, do the assignments, and bring them back
-		from numpy import float32, empty, inner, abs
+		#  all references go out in one collective; each rank contributes its (numref,nima) block,
+		#  and peaks being a C-contiguous float32 ndarray the send buffer is used as is,
+		#  with no per-element list conversion
+		recvcount_ref = [numref*recvcount[ip] for ip in range(number_of_proc)]
+		disps_ref     = [numref*disps[ip]     for ip in range(number_of_proc)]
+		recvbuf = mpi_gatherv(peaks.reshape(numref*nima), numref*nima, MPI_FLOAT, recvcount_ref, disps_ref, MPI_FLOAT, main_node, MPI_COMM_WORLD)
 		if( myid == 0 ):
-			dtot = empty( (numref, total_nima), dtype = float32)
-		for  iref in range(numref):
-			recvbuf = mpi_gatherv(peaks[iref], nima, MPI_FLOAT, recvcount, disps, MPI_FLOAT, main_node, MPI_COMM_WORLD)
-			if( myid == 0 ): dtot[iref] = recvbuf
+			#  stored image-major so gathering all reference scores of one image is unit-stride
+			dtotT   = empty( (total_nima, numref), dtype = float32)
+			recvbuf = asarray(recvbuf, dtype = float32)
+			for ip in range(number_of_proc):
+				dtotT[disps[ip]:disps[ip]+recvcount[ip], :] = \
+					recvbuf[disps_ref[ip]:disps_ref[ip]+recvcount_ref[ip]].reshape(numref, recvcount[ip]).transpose()
 		del recvbuf
 		#  The while loop over even angles delta should start here.
-		#  prepare reference directions
-		from utilities import even_angles, getvec
-		if   Tracker["constants"]["protein_shape"]=="g"  :refa = even_angles(60.0)     # globular proteins
-		elif Tracker["constants"]["protein_shape"]=="f"  :refa = even_angles(40.0, theta1=65, theta2=115) # filament proteins
-		numrefang = len(refa)
-		refanorm = empty( (numrefang, 3), dtype = float32)
-		for i in range(numrefang):
-			tmp = getvec(refa[i][0], refa[i][1])
-			for j in range(3):
-				refanorm[i][j] = tmp[j]
-		del  refa, tmp
-		transv = empty( (nima, 3), dtype = float32)
 		if runtype=="ASSIGNMENT":
-			for im in range(nima):
-				trns = data[im].get_attr("xform.projection")
-				for j in range(3):
-					transv[im][j] = trns.at(2,j)
+			rows = [data[im].get_attr("xform.projection") for im in range(nima)]
 		else:
 			# For REFINEMENT we have a problem, as the exact angle is known only after the next step of assigning projections.
 			# So, we will assume it is the one with max peak
-			for im in range(nima):
-				qt = -1.0e23
-				it = -1
-				for iref in range(numref):
-					pt = peaks[iref][im]
-					if(pt > qt):
-						qt = pt
-						it = iref
-				for j in range(3):
-					transv[im][j] = trans[it][im].at(2,j)
+			best_ref = peaks.argmax(axis = 0)
+			rows = [trans[best_ref[im]][im] for im in range(nima)]
+		#  build the (nima,3) direction array in a single C pass instead of per-element stores
+		transv = fromiter((trns.at(2,j) for trns in rows for j in range(3)), dtype = float32, count = 3*nima).reshape(nima, 3)
+		del rows
 		#  We have all vectors, now create a list of assignments of images to references
-		refassign = [-1]*nima
-		for im in range(nima):
-			refassign[im] = abs(inner(refanorm,transv[im])).argmax()
+		#  single matrix product against all reference directions, argmax over the reference axis
+		refassign = abs(dot(transv, refanorm.transpose())).argmax(axis = 1).astype(int32)
 		assigntorefa = mpi_gatherv(refassign, nima, MPI_INT, recvcount, disps, MPI_INT, main_node, MPI_COMM_WORLD)
-		assigntorefa = list(map(int, assigntorefa))
-		del refassign, refanorm, transv
+		assigntorefa = asarray(assigntorefa, dtype = int32)
+		#  refanorm is precomputed before the Iter loop and has to survive it
+		del refassign, transv
 		"""
 		#  Trying to use ISAC code for EQ-Kmeans  PAP 03/21/2015
 		if myid == main_node:
@@ -21489,9 +21528,14 @@ def mref_ali3d_EQ_Kmeans(ref_list, outdir, particle_list_file, Tracker):
 			SA = False
 			asi = [[] for iref in range(numref)]
 			report_error = 0
+			#  one stable sort replaces a findall scan of the full list per angular bin
+			refa_arr   = asarray(assigntorefa, dtype = int32)
+			bin_order  = refa_arr.argsort(kind = "stable")
+			bin_sorted = refa_arr[bin_order]
+			bin_starts = searchsorted(bin_sorted, arange(numrefang))
+			bin_ends   = searchsorted(bin_sorted, arange(numrefang), side = "right")
 			for imrefa in range(numrefang):
-				from utilities import findall
-				N = findall(imrefa, assigntorefa)
+				N = bin_order[bin_starts[imrefa]:bin_ends[imrefa]].tolist()
 				current_nima = len(N)
 				if( current_nima >= numref and report_error == 0):
 					tasi = [[] for iref in range(numref)]
@@ -21500,9 +21544,8 @@ def mref_ali3d_EQ_Kmeans(ref_list, outdir, particle_list_file, Tracker):
 					kt = numref
 					K = list(range(numref))
 
-					d = empty( (numref, current_nima), dtype = float32)
-					for ima in range(current_nima):
-						for iref in range(numref):  d[iref][ima] = dtot[iref][N[ima]]
+					#  one C-level gather of the peak columns belonging to this angular bin
+					d = ascontiguousarray(dtotT[asarray(N, dtype = intp)].transpose())
 
 					while nt > 0 and kt > 0:
 						l = d.argmax()
@@ -21525,21 +21568,16 @@ def mref_ali3d_EQ_Kmeans(ref_list, outdir, particle_list_file, Tracker):
 								if( sss <= Jc[group]): break
 						tasi[group].append(N[ima])
 						N[ima] = -1
-						for iref in range(numref):  d[iref][ima] = -1.e10
+						d[:,ima] = -1.e10
 						nt -= 1
 						masi = len(tasi[group])
 						if masi == maxasi:
-							for im in range(current_nima):  d[group][im] = -1.e10
+							d[group,:] = -1.e10
 							kt -= 1
 					else:
 						for ima in range(current_nima):
 							if N[ima] > -1:
-								qm = -1.e10
-								for iref in range(numref):
-									qt = dtot[iref][N[ima]]
-									if( qt > qm ):
-										qm = qt
-										group = iref
+								group = int(dtotT[N[ima]].argmax())
 								tasi[group].append(N[ima])
 					del d, N, K
 					if  SA:  del J, Jc
@@ -21549,7 +21587,7 @@ def mref_ali3d_EQ_Kmeans(ref_list, outdir, particle_list_file, Tracker):
 				else:
 					report_error = 1
 			#  This should be deleted only once we know that the number of images is sufficiently large, see below.
-			del dtot
+			del dtotT
 		else:
 			assignment = []
 			report_error = 0
@@ -21632,44 +21670,39 @@ def mref_ali3d_EQ_Kmeans(ref_list, outdir, particle_list_file, Tracker):
 		else:
 			assignment = []
 		'''
-		assignment = mpi_scatterv(assignment, recvcount, disps, MPI_INT, recvcount[myid], MPI_INT, main_node, MPI_COMM_WORLD)
-		assignment = list(map(int, assignment))
-		#  compute number of particles that changed assignment and how many are in which group
-		nchng = 0
-		npergroup = [0]*numref
-		for im in range(nima):
-			iref = data[im].get_attr('group')
-			npergroup[assignment[im]] += 1
-			if( iref != assignment[im]): nchng += 1
-			data[im].set_attr('group', assignment[im])
-		nchng = mpi_reduce(nchng, 1, MPI_INT, MPI_SUM, 0, MPI_COMM_WORLD)
-		npergroup = mpi_reduce(npergroup, numref, MPI_INT, MPI_SUM, 0, MPI_COMM_WORLD)
-		npergroup = list(map(int, npergroup))
-		terminate = 0
+		#  every rank takes its own slice from one broadcast of the full assignment,
+		#  avoiding the two-sided coordination of scatterv
+		if( myid != main_node ):  assignment = [0]*total_nima
+		assignment = mpi_bcast(assignment, total_nima, MPI_INT, main_node, MPI_COMM_WORLD)
+		assignment = list(map(int, assignment[disps[myid]:disps[myid]+recvcount[myid]]))
+		#  compute number of particles that changed assignment and how many are in which group,
+		#  packed so a single reduce carries both tallies
+		prev_group = fromiter((data[im].get_attr('group') for im in range(nima)), dtype = int32, count = nima)
+		new_group  = asarray(assignment, dtype = int32)
+		for im in range(nima):  data[im].set_attr('group', assignment[im])
+		counts = zeros(numref+1, dtype = int32)
+		counts[:numref] = bincount(new_group, minlength = numref)
+		counts[numref]  = (prev_group != new_group).sum()
+		counts = mpi_reduce(counts, numref+1, MPI_INT, MPI_SUM, 0, MPI_COMM_WORLD)
+		#  emulated allreduce: rebroadcast the packed tallies so every rank derives
+		#  the group sizes and the termination decision locally
+		if( myid == 0 ):  counts = list(map(int, counts))
+		else:             counts = [0]*(numref+1)
+		counts = mpi_bcast(counts, numref+1, MPI_INT, 0, MPI_COMM_WORLD)
+		ngroup = list(map(int, counts[:numref]))
+		nchng  = int(counts[numref])
+		precn  = 100*float(nchng)/float(total_nima)
+		terminate = int(precn <= termprec)
 		if( myid == 0 ):
-			ngroup=[]
-			nchng = int(nchng[0])
-			precn = 100*float(nchng)/float(total_nima)
-			msg = " Number of particles that changed assignments %7d, percentage of total: %5.1f"%(nchng, precn)
-			log.add(msg)
-			msg = " Group       number of particles"
-			log.add(msg)
+			log.add(" Number of particles that changed assignments %7d, percentage of total: %5.1f"%(nchng, precn))
+			log.add(" Group       number of particles")
 			for iref in range(numref):
-				msg = " %5d       %7d"%(iref+1, npergroup[iref])
-				log.add(msg)
-				ngroup.append(int(npergroup[iref]))
-			if(precn <= termprec):  terminate = 1
-		else:
-			ngroup = 0
-		terminate = mpi_bcast(terminate, 1, MPI_INT, 0, MPI_COMM_WORLD)
-		terminate = int(terminate[0])
-		ngroup = wrap_mpi_bcast(ngroup,main_node)
+				log.add(" %5d       %7d"%(iref+1, ngroup[iref]))
 
 		if runtype=="REFINEMENT":
 			for im in range(nima):
 				data[im].set_attr('xform.projection', trans[assignment[im]][im])
 				pixer[0][im] = pixer[assignment[im]][im]
-			pixer = pixer[0]
 			if(center == -1):
 				cs[0], cs[1], cs[2], dummy, dummy = estimate_3D_center_MPI(data, total_nima, myid, number_of_proc, main_node)				
 				if myid == main_node:
@@ -21679,11 +21712,10 @@ def mref_ali3d_EQ_Kmeans(ref_list, outdir, particle_list_file, Tracker):
 				cs = [-float(cs[0]), -float(cs[1]), -float(cs[2])]
 				rotate_3D_shift(data, cs)
 			#output pixel errors
-			recvbuf = mpi_gatherv(pixer, nima, MPI_FLOAT, recvcount, disps, MPI_FLOAT, main_node, MPI_COMM_WORLD)
+			recvbuf = mpi_gatherv(pixer[0], nima, MPI_FLOAT, recvcount, disps, MPI_FLOAT, main_node, MPI_COMM_WORLD)
 			mpi_barrier(MPI_COMM_WORLD)
 			if(myid == main_node):
-				recvbuf = list(map(float, recvbuf))
-				from pap_statistics import hist_list
+				recvbuf = asarray(recvbuf, dtype = float32)
 				lhist = 20
 				region, histo = hist_list(recvbuf, lhist)
 				if(region[0] < 0.0):  region[0] = 0.0
@@ -21700,13 +21732,12 @@ def mref_ali3d_EQ_Kmeans(ref_list, outdir, particle_list_file, Tracker):
 		start_time = time()
 
 		if( not focus ):
-			for im in range(nima):  data[im] = fft(data[im])
+			data = fft_many(data)
 		highres = []
 		lowpass_tmp = []
 		tmpref =[]
 		for iref in range(numref):
 			#  3D stuff
-			from time import localtime, strftime
 			if Tracker["constants"]["3d-interpolation"]=="trl":
 				chunk_id   = 0
 				niter      = 10
@@ -21784,7 +21815,7 @@ def mref_ali3d_EQ_Kmeans(ref_list, outdir, particle_list_file, Tracker):
 	
 				if Tracker["mask3D"]: Util.mul_img(volref, mask3D)
 				volref.write_image( os.path.join(outdir,"volf%04d.hdf"%(total_iter)), iref)
-				del volref
+				volf_list[iref] = volref
 				
 		"""
 		if runtype=="REFINEMENT":
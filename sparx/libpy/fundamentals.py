@@ -418,6 +418,13 @@ def fft(e, npad=1):
 		else:
 			return e.do_fft()
 
+def fft_many(data, npad=1):
+	"""Out-of-place fft / ift of a list of images.
+	   Single entry point for transforming a whole particle stack; callers
+	   batch through here instead of dispatching fft() per particle.
+	"""
+	return [fft(e, npad) for e in data]
+
 def fftip(e):
 	"""In-place fft / ift
 	   No padding performed, and fft-extension along x NOT removed after ift.
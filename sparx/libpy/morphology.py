@@ -1754,19 +1754,27 @@ def cosinemask(im, radius = -1, cosine_width = 5, bckg = None, s=999999.0):
 '''
 
 
+_shrink_3dmask_cache = {}
+
 def get_shrink_3dmask(nxinit, mask_file_name):
 	from utilities import get_im
 	from fundamentals import resample
 	from morphology   import binarize
+	#  the same mask is requested repeatedly at the same size within one sorting
+	#  run, so keep the resampled result; a copy is returned to preserve the
+	#  fresh-object semantics of the uncached version
+	key = (nxinit, mask_file_name)
+	if isinstance(mask_file_name, str) and key in _shrink_3dmask_cache:
+		return _shrink_3dmask_cache[key].copy()
 	mask3d = get_im(mask_file_name)
 	nx2 = nxinit
 	nx1 = mask3d.get_xsize()
-	if nx1 == nx2:
-		return mask3d
-	else:
+	if nx1 != nx2:
 		shrinkage = float(nx2)/nx1
 		mask3d    = binarize(resample(mask3d,shrinkage),0.5) #added 0.5 here to fix binarization problem
-		return mask3d
+	if isinstance(mask_file_name, str):
+		_shrink_3dmask_cache[key] = mask3d.copy()
+	return mask3d
 
 
 def get_biggest_cluster(mg):
@@ -357,7 +357,7 @@ def gen_rings_ctf( prjref, nx, ctf, numr):
 	  Convert set of ffts of projections to Fourier rings with additional multiplication by a ctf
 	  The command returns list of rings
 	"""
-	from math         import sin, cos, pi
+	from numpy        import array, radians, sin, cos, float64
 	from fundamentals import fft
 	from alignment    import ringwe
 	from filter       import filt_ctf
@@ -365,7 +365,17 @@ def gen_rings_ctf( prjref, nx, ctf, numr):
 	wr_four  = ringwe(numr, "F")
 	cnx = nx//2 + 1
 	cny = nx//2 + 1
-	qv = pi/180.0
+
+	if( len(prjref) == 0 ):  return []
+	#  direction vectors of all reference projections computed in one vectorized pass
+	#  instead of per-call scalar trigonometry
+	angles = array([[prj.get_attr('phi'), prj.get_attr('theta'), prj.get_attr('psi')] for prj in prjref], dtype = float64)
+	phirad   = radians(angles[:,0])
+	thetarad = radians(angles[:,1])
+	sintheta = sin(thetarad)
+	n1 = sintheta*cos(phirad)
+	n2 = sintheta*sin(phirad)
+	n3 = cos(thetarad)
 
 	refrings = []     # list of (image objects) reference projections in Fourier representation
 
@@ -376,13 +386,8 @@ def gen_rings_ctf( prjref, nx, ctf, numr):
 		Util.Frngs(cimage, numr)
 		Util.Applyws(cimage, numr, wr_four)
 		refrings.append(cimage)
-		phi   = prjref[i].get_attr('phi')
-		theta = prjref[i].get_attr('theta')
-		psi   = prjref[i].get_attr('psi')
-		n1 = sin(theta*qv)*cos(phi*qv)
-		n2 = sin(theta*qv)*sin(phi*qv)
-		n3 = cos(theta*qv)
-		refrings[i].set_attr_dict( {"n1":n1, "n2":n2, "n3":n3, "phi": phi, "theta": theta,"psi": psi} )
+		refrings[i].set_attr_dict( {"n1":float(n1[i]), "n2":float(n2[i]), "n3":float(n3[i]), \
+			"phi": float(angles[i,0]), "theta": float(angles[i,1]), "psi": float(angles[i,2])} )
 
 	return refrings
 
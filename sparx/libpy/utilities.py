@@ -5427,7 +5427,12 @@ def if_error_then_all_processes_exit_program(error_status):
 		my_mpi_finalize()
 		exit() # sys.exit(1)
 
-def get_shrink_data_huang(Tracker, nxinit, partids, partstack, myid, main_node, nproc, preshift = False):
+#  cache of broadcast alignment-parameter tables keyed by file name; the sorting
+#  pipelines call get_shrink_data_huang many times per generation with the same
+#  partstack file, so read and broadcast it only once
+_partstack_cache = {}
+
+def get_shrink_data_huang(Tracker, nxinit, partids, partstack, myid, main_node, nproc, preshift = False, mpi_comm = None):
 	# The function will read from stack a subset of images specified in partids
 	#   and assign to them parameters from partstack with optional CTF application and shifting of the data.
 	# So, the lengths of partids and partstack are the same.
@@ -5448,11 +5453,16 @@ def get_shrink_data_huang(Tracker, nxinit, partids, partstack, myid, main_node,
 	'''
 	if( myid == main_node ): lpartids = read_text_file(partids)
 	else:  lpartids = 0
-	lpartids = wrap_mpi_bcast(lpartids, main_node)
+	lpartids = wrap_mpi_bcast(lpartids, main_node, mpi_comm)
 	ndata = len(lpartids)
-	if( myid == main_node ):  partstack = read_text_row(partstack)
-	else:  partstack = 0
-	partstack = wrap_mpi_bcast(partstack, main_node)
+	if partstack in _partstack_cache:
+		partstack = _partstack_cache[partstack]
+	else:
+		partstack_file = partstack
+		if( myid == main_node ):  partstack = read_text_row(partstack)
+		else:  partstack = 0
+		partstack = wrap_mpi_bcast(partstack, main_node, mpi_comm)
+		_partstack_cache[partstack_file] = partstack
 	if( ndata < nproc):
 		if(myid<ndata):
 			image_start = myid
@@ -5512,7 +5522,7 @@ def get_shrink_data_huang(Tracker, nxinit, partids, partstack, myid, main_node,
 		#  We will always set it to simplify the code
 		set_params_proj(data[im],[phi,theta,psi,0.0,0.0], "xform.anchor")
 		chunk_id_state = data[im].get_attr_default("chunk_id",None)
-		if chunk_id_state == None: data[im].set_attr("chunk_id",Tracker["chunk_dict"][ lpartids[im]])
+		if chunk_id_state == None: data[im].set_attr("chunk_id",int(Tracker["chunk_dict"][ lpartids[im]]))
 	assert( nxinit == data[0].get_xsize() )  #  Just to make sure.
 	#oldshifts = wrap_mpi_gatherv(oldshifts, main_node, MPI_COMM_WORLD)
 	return data, oldshifts
@@ -6021,53 +6031,25 @@ def get_sorting_attr_stack(data_stack):
 	return attr_value_list
 
 def get_sorting_params(Tracker,data):
-	from mpi import mpi_barrier, MPI_COMM_WORLD
-	from utilities import read_text_row,wrap_mpi_bcast,even_angles
-	from applications import MPI_start_end
-	myid      = Tracker["constants"]["myid"]
+	from mpi import MPI_COMM_WORLD
+	from utilities import wrap_mpi_bcast, wrap_mpi_gatherv
 	main_node = Tracker["constants"]["main_node"]
-	nproc     = Tracker["constants"]["nproc"]
-	ndata     = Tracker["total_stack"]
 	mpi_comm  = MPI_COMM_WORLD
-	if myid == main_node:
-		total_attr_value_list = []
-		for n in range(ndata):
-			total_attr_value_list.append([])
-	else:
-		total_attr_value_list = 0
-	for inode in range(nproc):
-		attr_value_list = get_attr_stack(data,"group")
-		attr_value_list = wrap_mpi_bcast(attr_value_list,inode)
-		if myid == main_node:
-			image_start,image_end = MPI_start_end(ndata,nproc,inode)
-			total_attr_value_list = fill_in_mpi_list(total_attr_value_list,attr_value_list,image_start,image_end)
-		mpi_barrier(MPI_COMM_WORLD)
-	total_attr_value_list = wrap_mpi_bcast(total_attr_value_list,main_node)
+	#  each rank extracts its local attributes once; the gather assembles them in
+	#  rank order, which is the MPI_start_end distribution order of the data
+	attr_value_list       = get_attr_stack(data,"group")
+	total_attr_value_list = wrap_mpi_gatherv(attr_value_list, main_node, mpi_comm)
+	total_attr_value_list = wrap_mpi_bcast(total_attr_value_list, main_node, mpi_comm)
 	return total_attr_value_list
 
 def get_sorting_params_refine(Tracker,data,ndata):
-	from mpi import mpi_barrier, MPI_COMM_WORLD
-	from utilities import read_text_row,wrap_mpi_bcast,even_angles
-	from applications import MPI_start_end
-	myid       = Tracker["constants"]["myid"]
-	main_node  = Tracker["constants"]["main_node"]
-	nproc      = Tracker["constants"]["nproc"]
-	#ndata     = Tracker["total_stack"]
-	mpi_comm   = MPI_COMM_WORLD
-	if myid == main_node:
-		total_attr_value_list = []
-		for n in range(ndata):
-			total_attr_value_list.append([])
-	else:
-		total_attr_value_list = 0
-	for inode in range(nproc):
-		attr_value_list = get_sorting_attr_stack(data)
-		attr_value_list = wrap_mpi_bcast(attr_value_list,inode)
-		if myid == main_node:
-			image_start,image_end = MPI_start_end(ndata,nproc,inode)
-			total_attr_value_list = fill_in_mpi_list(total_attr_value_list, attr_value_list, image_start,image_end)
-		mpi_barrier(MPI_COMM_WORLD)
-	total_attr_value_list = wrap_mpi_bcast(total_attr_value_list, main_node)
+	from mpi import MPI_COMM_WORLD
+	from utilities import wrap_mpi_bcast, wrap_mpi_gatherv
+	main_node = Tracker["constants"]["main_node"]
+	mpi_comm  = MPI_COMM_WORLD
+	attr_value_list       = get_sorting_attr_stack(data)
+	total_attr_value_list = wrap_mpi_gatherv(attr_value_list, main_node, mpi_comm)
+	total_attr_value_list = wrap_mpi_bcast(total_attr_value_list, main_node, mpi_comm)
 	return total_attr_value_list
 
 def parsing_sorting_params(sorting_params_list):
@@ -6079,70 +6061,56 @@ def parsing_sorting_params(sorting_params_list):
 	return group_list, ali3d_params_list
 
 def fill_in_mpi_list(mpi_list,data_list,index_start,index_end):
-	for index in range(index_start, index_end):
-		mpi_list[index] = data_list[index-index_start]
+	mpi_list[index_start:index_end] = data_list[0:index_end-index_start]
 	return mpi_list
 
 def get_groups_from_partition(partition, initial_ID_list, number_of_groups):
-	# sort out Kmref results to individual groups that has initial IDs
-	# make a dictionary
-	dict = {}
-	for iptl in range(len(initial_ID_list)):
-		dict[iptl] = initial_ID_list[iptl]
-	res = []
-	for igrp in range(number_of_groups):
-		class_one = []
-		for ipt in range(len(partition)):
-			if partition[ipt] == igrp:
-				orginal_id = dict[ipt]
-				class_one.append(orginal_id)
-		res.append(class_one)
-	return res
+	# sort out Kmref results to individual groups that has initial IDs;
+	# one stable sort by group label replaces a scan of the partition per group
+	import numpy
+	parr  = numpy.asarray(partition, dtype = numpy.int32)
+	ids   = numpy.asarray(initial_ID_list)
+	order = numpy.argsort(parr, kind = "stable")
+	edges = numpy.searchsorted(parr[order], numpy.arange(number_of_groups+1))
+	sorted_ids = ids[order]
+	return [sorted_ids[edges[igrp]:edges[igrp+1]].tolist() for igrp in range(number_of_groups)]
 
 def remove_small_groups(class_list,minimum_number_of_objects_in_a_group):
-	new_class  = []
-	final_list = []
-	for one_class in class_list:
-		if len(one_class)>=minimum_number_of_objects_in_a_group:
-			new_class.append(one_class)
-			for element in one_class:
-				final_list.append(element)
-	final_list.sort()
+	from itertools import chain
+	new_class  = [one_class for one_class in class_list if len(one_class)>=minimum_number_of_objects_in_a_group]
+	final_list = sorted(chain.from_iterable(new_class))
 	return final_list, new_class
 
 #### Used in the main programm
 
 def sample_down_1D_curve(nxinit, nnxo, pspcurv_nnxo_file):
-	shrinkage=float(nnxo)/float(nxinit)
-	curv_orgn = read_text_file(pspcurv_nnxo_file)
-	new_curv=int(1.5*len(curv_orgn))*[0.0]
-	for index in range(len(curv_orgn)):
-		new_index = int(old_div(index,shrinkage))
-		fraction  = old_div(index,shrinkage)-new_index
-		if fraction <=0:
-			new_curv[new_index] +=curv_orgn[index]
-		else:
-			new_curv[new_index]  +=(1.-fraction)*curv_orgn[index]
-			new_curv[new_index+1] += fraction*curv_orgn[index]
-	return new_curv
+	import numpy
+	shrinkage = float(nnxo)/float(nxinit)
+	curv_orgn = numpy.asarray(read_text_file(pspcurv_nnxo_file), dtype = numpy.float64)
+	new_curv  = numpy.zeros(int(1.5*curv_orgn.size), dtype = numpy.float64)
+	position  = old_div(numpy.arange(curv_orgn.size), shrinkage)
+	new_index = position.astype(numpy.int64)
+	fraction  = position - new_index
+	# scatter-add each sample into the two bracketing bins; for fraction == 0
+	# the full weight lands in new_index, as in the original per-sample loop
+	numpy.add.at(new_curv, new_index,   (1.-fraction)*curv_orgn)
+	numpy.add.at(new_curv, new_index+1, fraction*curv_orgn)
+	return new_curv.tolist()
 
 def get_initial_ID(part_list, full_ID_dict):
-	part_initial_id_list = []
-	#new_dict = {}
-	for iptl in range(len(part_list)):
-		part_initial_id_list.append(full_ID_dict[part_list[iptl]])
-		#new_dict[iptl] = id
-	return part_initial_id_list#, new_dict
+	import numpy
+	if isinstance(full_ID_dict, numpy.ndarray):
+		return full_ID_dict[numpy.asarray(part_list, dtype = numpy.int64)].tolist()
+	if len(full_ID_dict)>0 and min(full_ID_dict) == 0 and max(full_ID_dict) == len(full_ID_dict)-1:
+		# dense keys: gather through a NumPy array instead of per-particle dict lookups
+		full_ID_arr = numpy.fromiter((full_ID_dict[k] for k in range(len(full_ID_dict))), dtype = numpy.int64)
+		return full_ID_arr[numpy.asarray(part_list, dtype = numpy.int64)].tolist()
+	return [full_ID_dict[iptl] for iptl in part_list]
 
 def remove_small_groups(class_list,minimum_number_of_objects_in_a_group):
-	new_class  = []
-	final_list = []
-	for one_class in class_list:
-		if len(one_class)>=minimum_number_of_objects_in_a_group:
-			new_class.append(one_class)
-			for element in one_class:
-				final_list.append(element)
-	final_list.sort()
+	from itertools import chain
+	new_class  = [one_class for one_class in class_list if len(one_class)>=minimum_number_of_objects_in_a_group]
+	final_list = sorted(chain.from_iterable(new_class))
 	return final_list, new_class
 
 def print_upper_triangular_matrix(data_table_dict,N_indep,log_main):
@@ -6165,29 +6133,16 @@ def print_a_line_with_timestamp(string_to_be_printed ):
 	return string_to_be_printed
 
 def convertasi(asig,K):
-	from numpy import array
-	p = []
-	for k in range(K):
-		l = []
-		for i in range(len(asig)):
-			if( asig[i ]== k ): l.append(i)
-		l = array(l,"int32")
-		l.sort()
-		p.append(l)
-	return p
+	# one stable sort replaces K scans of the assignment list
+	from numpy import asarray, argsort, searchsorted, arange, int32
+	arr    = asarray(asig, dtype = int32)
+	order  = argsort(arr, kind = "stable").astype(int32)
+	starts = searchsorted(arr[order], arange(K))
+	ends   = searchsorted(arr[order], arange(K), side = "right")
+	return [order[starts[k]:ends[k]] for k in range(K)]
 
 def prepare_ptp(data_list, K):
-	num_of_pt = len(data_list)
-	ptp=[]
-	for ipt in range(num_of_pt):
-		ptp.append([])
-	for ipt in range(num_of_pt):
-		nc = len(data_list[ipt])
-		asig  =[-1]*nc
-		for i in range(nc):
-			asig[i] = data_list[ipt][i]
-		ptp[ipt] = convertasi(asig, K)
-	return ptp
+	return [convertasi(data_list[ipt], K) for ipt in range(len(data_list))]
 
 def print_dict(dict,theme):
 		line = strftime("%Y-%m-%d_%H:%M:%S", localtime()) + " =>"
@@ -6234,14 +6189,9 @@ def get_resolution_mrk01(vol, radi, nnxo, fscoutputdir, mask_option):
 	return  round(lowpass,4), round(falloff,4), round(currentres,2)
 
 def partition_to_groups(alist, K):
-	res =[]
-	for igroup in range(K):
-		this_group =[]
-		for imeb in range(len(alist)):
-			if( alist[imeb] == igroup ):   this_group.append(imeb)
-		this_group.sort()
-		res.append(this_group)
-	return res
+	import numpy
+	arr = numpy.asarray(alist, dtype = numpy.int32)
+	return [numpy.where(arr == igroup)[0].tolist() for igroup in range(K)]
 
 def partition_independent_runs(run_list, K):
 	indep_runs_groups = {}
@@ -6250,12 +6200,8 @@ def partition_independent_runs(run_list, K):
 	return indep_runs_groups
 
 def get_outliers(total_number,plist):
-	tlist={}
-	for i in range(total_number):tlist[i]=i
-	for a in plist:   del tlist[a]
-	out =[]
-	for a in tlist:   out.append(a)
-	return out
+	import numpy
+	return numpy.setdiff1d(numpy.arange(total_number), numpy.asarray(plist, dtype = numpy.int64)).tolist()
 
 def merge_groups(stable_members_list):
 	alist=[]
@@ -6285,7 +6231,7 @@ def get_margin_of_error(this_group_of_data,Tracker):
 	return abs(rate1-Tracker["P_chunk0"]),ratio,abs(rate2-Tracker["P_chunk1"]),ratio
 
 def do_two_way_comparison(Tracker):
-	from mpi import mpi_barrier, MPI_COMM_WORLD
+	from mpi import MPI_COMM_WORLD
 	from utilities import read_text_file,write_text_file
 	from pap_statistics import k_means_match_clusters_asg_new
 	import os
@@ -6326,13 +6272,13 @@ def do_two_way_comparison(Tracker):
 					log_main.add(" actual percentage is %f"%rate1)
 		if myid ==main_node:
 			log_main.add("------------------------------------------------------------------------------")
+		import numpy
 		total_pop=0
 		two_ways_stable_member_list = {}
-		avg_two_ways                = 0.0
-		avg_two_ways_square         = 0.0
-		scores                      = {}
-		for iptp in range(len(ptp)):
-			for jptp in range(len(ptp)):
+		nptp                        = len(ptp)
+		scores                      = numpy.zeros((nptp, nptp), dtype = numpy.float64)
+		for iptp in range(nptp):
+			for jptp in range(nptp):
 				newindeces, list_stable, nb_tot_objs = k_means_match_clusters_asg_new(ptp[iptp], ptp[jptp])
 				tt = 0.0
 				if myid ==main_node and iptp<jptp:
@@ -6347,30 +6293,24 @@ def do_two_way_comparison(Tracker):
 				rate = old_div(tt,total_stack)*100.0
 				scores[(iptp,jptp)]    = rate
 				if iptp<jptp :
-					avg_two_ways 	    += rate
-					avg_two_ways_square += rate**2
 					total_pop += 1
-					new_list=[]
-					for any in list_stable:
-						any.tolist()
-						new_list.append(any)
-					two_ways_stable_member_list[(iptp,jptp)] = new_list[:]
-					del new_list
+					#  store plain lists; the bare tolist() call used to discard its result
+					two_ways_stable_member_list[(iptp,jptp)] = [any.tolist() for any in list_stable]
 		if myid ==main_node:
 			log_main.add("two_way comparison is done!")
-		#### Score each independent run by pairwise summation
-		summed_scores = []
-		two_way_dict  = {}
-		for ipp in range(len(ptp)):
-			avg_scores =0.0
-			for jpp in range(len(ptp)):
-				if ipp!=jpp:
-					avg_scores += scores[(ipp,jpp)]
-			avg_rate =old_div(avg_scores,(len(ptp)-1))
-			summed_scores.append(avg_rate)
-			two_way_dict[avg_rate] =ipp
-		#### Select two independent runs that have the first two highest scores
-		run1, run2,rate1,rate2 = select_two_runs(summed_scores,two_way_dict)
+		#### Score each independent run by pairwise summation, one vectorized pass
+		upper               = scores[numpy.triu_indices(nptp, k = 1)]
+		avg_two_ways        = upper.sum()
+		avg_two_ways_square = (upper*upper).sum()
+		summed_scores = (old_div((scores.sum(axis = 1) - scores.diagonal()),(nptp-1))).tolist()
+		#### Select two independent runs that have the first two highest scores;
+		#    pick by run index directly - a dict keyed by float scores silently
+		#    dropped runs whose scores happened to tie
+		pairs = sorted(enumerate(summed_scores), key = lambda x: -x[1])
+		rate1 = pairs[0][1]
+		rate2 = pairs[1][1]
+		run1  = min(pairs[0][0], pairs[1][0])
+		run2  = max(pairs[0][0], pairs[1][0])
 		Tracker["two_way_stable_member"]      = two_ways_stable_member_list[(run1,run2)]
 		Tracker["pop_size_of_stable_members"] = 1
 		if myid == main_node:
@@ -6382,13 +6322,18 @@ def do_two_way_comparison(Tracker):
 		small_group_list  = []
 		if myid ==main_node:
 			log_main.add("------------------margin of error--------------------------------------------")
-		for istable in range(len(Tracker["two_way_stable_member"])):
-			new_one_class                    = get_initial_ID(Tracker["two_way_stable_member"][istable], Tracker["full_ID_dict"])
-			rate1, rate2, size_of_this_group = count_chunk_members(Tracker["chunk_dict"], new_one_class)
-			error=margin_of_error(Tracker["P_chunk0"],size_of_this_group)
+		#  Map all classes to original IDs and tally their chunk members up front,
+		#  then get every margin of error with a single vectorized sqrt
+		stable_classes = [get_initial_ID(one_class, Tracker["full_ID_dict"]) for one_class in Tracker["two_way_stable_member"]]
+		chunk_tallies  = [count_chunk_members(Tracker["chunk_dict"], one_class) for one_class in stable_classes]
+		sizes          = numpy.asarray([tally[2] for tally in chunk_tallies], dtype = numpy.float64)
+		P0             = Tracker["P_chunk0"]
+		errors         = numpy.sqrt(old_div(P0*(1.-P0), sizes))
+		for istable in range(len(stable_classes)):
+			new_one_class = stable_classes[istable]
 			if myid ==main_node:
-				log_main.add(" margin of error for chunk0 is %f    %f    %d"%((Tracker["P_chunk0"]-error),(Tracker["P_chunk0"]+error),size_of_this_group))
-				log_main.add(" actual percentage is %f"%rate1)
+				log_main.add(" margin of error for chunk0 is %f    %f    %d"%((P0-errors[istable]),(P0+errors[istable]),int(sizes[istable])))
+				log_main.add(" actual percentage is %f"%chunk_tallies[istable][0])
 			if( len(new_one_class)>= Tracker["constants"]["smallest_group"] ):  stable_class_list.append(new_one_class)
 			else:                                                               small_group_list.append(new_one_class)
 		if myid ==main_node:
@@ -6396,10 +6341,8 @@ def do_two_way_comparison(Tracker):
 		accounted_list = merge_groups(stable_class_list)
 		Tracker["this_accounted_list"]   =  accounted_list
 		Tracker["two_way_stable_member"] =  stable_class_list
-		mpi_barrier(MPI_COMM_WORLD)
 		save_alist(Tracker,"Accounted.txt", accounted_list)
 		update_full_dict(accounted_list,Tracker)# Update full_ID_dict for Kmeans
-		mpi_barrier(MPI_COMM_WORLD)
 		Tracker["this_unaccounted_dir"]     = workdir
 		Tracker["this_unaccounted_text"]    = os.path.join(workdir,"Unaccounted.txt")
 		Tracker["this_accounted_text"]      = os.path.join(workdir,"Accounted.txt")
@@ -6425,26 +6368,20 @@ def do_two_way_comparison(Tracker):
 			print_upper_triangular_matrix(scores,Tracker["constants"]["indep_runs"],log_main)
 		del two_ways_stable_member_list
 		Tracker["score_of_this_comparison"]=(avg_two_ways,two_ways_std,net_rate)
-		mpi_barrier(MPI_COMM_WORLD)
 
 def select_two_runs(summed_scores,two_way_dict):
-	summed_scores.sort()
-	rate1 = summed_scores[-1]
+	# linear scan for the largest and the second-largest distinct scores;
+	# no sorted copy and no in-place sort of the caller's list
+	rate1 = max(summed_scores)
 	rate2 = None
-	for index in range(2,len(summed_scores)+1):
-		rate2 =summed_scores[-index]
-		if rate2 !=rate1:
-			break
+	for score in summed_scores:
+		if score != rate1 and (rate2 == None or score > rate2):
+			rate2 = score
 	if rate2 != None:
-		if rate1 != rate2:
-			tmp_run1= two_way_dict[rate1]
-			tmp_run2= two_way_dict[rate2]
-			run1 = min(tmp_run1,tmp_run2)
-			run2 = max(tmp_run1,tmp_run2)
-		else:
-			run1 = 0
-			run2 = 1
-			rate2=rate1
+		tmp_run1= two_way_dict[rate1]
+		tmp_run2= two_way_dict[rate2]
+		run1 = min(tmp_run1,tmp_run2)
+		run2 = max(tmp_run1,tmp_run2)
 	else:
 		run1 =0
 		run2 =1
@@ -6459,56 +6396,68 @@ def get_ali3d_params(ali3d_old_text_file,shuffled_list):
 		ali3d_new.append(ali3d_old[shuffled_list[iptl]])
 	return ali3d_new
 
+def unit_directions(angle_list):
+	"""
+	  Convert a list of [phi, theta, ...] angles in degrees into an (N,3) array
+	  of unit direction vectors.
+	"""
+	import numpy
+	ang = numpy.radians(numpy.asarray([[a[0], a[1]] for a in angle_list], dtype = numpy.float64))
+	st  = numpy.sin(ang[:,1])
+	return numpy.column_stack((st*numpy.cos(ang[:,0]), st*numpy.sin(ang[:,0]), numpy.cos(ang[:,1])))
+
+#  sampling directions depend only on delta, so keep them across calls
+_even_angles_cache = {}
+
 def counting_projections(delta, ali3d_params, image_start):
-	from utilities import even_angles,angle_between_projections_directions
+	from utilities import even_angles
+	import numpy
 	sampled_directions = {}
-	angles=even_angles(delta,0,180)
+	if delta not in _even_angles_cache:  _even_angles_cache[delta] = even_angles(delta,0,180)
+	angles = _even_angles_cache[delta]
 	for a in angles:
 		[phi0, theta0, psi0]=a
 		sampled_directions[(phi0,theta0)]=[]
-	from math import sqrt
+	if len(ali3d_params) == 0:  return sampled_directions
+	#  the closest sampled direction maximizes the dot product of unit vectors;
+	#  one matrix product scores all particles against all directions at once
+	nearest = numpy.dot(unit_directions(ali3d_params), unit_directions(angles).transpose()).argmax(axis = 1)
 	for i in range(len(ali3d_params)):
-		[phi, theta, psi, s2x, s2y] = ali3d_params[i]
-		dis_min    = 9999.
-		this_phi   = 9999.
-		this_theta = 9999.
-		this_psi   = 9999.
-		prj1       =[phi,theta]
-		for j in range(len(angles)):
-			[phi0, theta0, psi0] = angles[j]
-			prj2 =[phi0,theta0]
-			dis = angle_between_projections_directions(prj1, prj2)
-			if dis<dis_min:
-				dis_min    =dis
-				this_phi   =phi0
-				this_theta =theta0
-				this_psi   =psi0
-		alist = sampled_directions[(this_phi,this_theta)]
-		alist.append(i+image_start)
-		sampled_directions[(this_phi,this_theta)]=alist
+		[phi0, theta0, psi0] = angles[nearest[i]]
+		sampled_directions[(phi0,theta0)].append(i+image_start)
 	return sampled_directions
 
 def unload_dict(dict_angles):
-	dlist =[]
-	for a in dict_angles:
-		tmp=[a[0],a[1]]
-		tmp_list=dict_angles[a]
-		for b in tmp_list:
-			tmp.append(b)
-		dlist.append(tmp)
-	return dlist
-
-def load_dict(dict_angle_main_node, unloaded_dict_angles):
-	for ang_proj in unloaded_dict_angles:
-		if len(ang_proj)>2:
-			for item in range(2,len(ang_proj)):
-				dict_angle_main_node[(ang_proj[0],ang_proj[1])].append(item)
+	#  Flatten {(phi,theta):[ids]} into two flat int32 buffers: per-direction
+	#  counts and the concatenated ids.  The direction keys are generated
+	#  identically on every rank, so only the numeric payload has to travel.
+	import numpy
+	counts = numpy.fromiter((len(dict_angles[a]) for a in dict_angles), dtype = numpy.int32, count = len(dict_angles))
+	ids    = numpy.fromiter((b for a in dict_angles for b in dict_angles[a]), dtype = numpy.int32, count = int(counts.sum()))
+	return counts, ids
+
+def load_dict(dict_angle_main_node, all_counts, all_ids, nproc):
+	#  Rebuild the per-direction id lists from rank-concatenated flat buffers
+	#  produced by gathering unload_dict output from every rank.
+	import numpy
+	bins       = list(dict_angle_main_node.keys())
+	all_counts = numpy.asarray(all_counts, dtype = numpy.int64).reshape(nproc, len(bins))
+	all_ids    = numpy.asarray(all_ids,    dtype = numpy.int64)
+	for a in bins:  dict_angle_main_node[a] = []
+	offset = 0
+	for ip in range(nproc):
+		edges = numpy.concatenate(([0], all_counts[ip].cumsum())) + offset
+		for ibin in range(len(bins)):
+			if( edges[ibin+1] > edges[ibin] ):
+				dict_angle_main_node[bins[ibin]].extend(all_ids[edges[ibin]:edges[ibin+1]].tolist())
+		offset = int(edges[-1])
 	return dict_angle_main_node
 
 def get_stat_proj(Tracker,delta,this_ali3d):
-	from mpi import mpi_barrier, MPI_COMM_WORLD
+	from mpi import MPI_COMM_WORLD, mpi_gatherv, MPI_INT
 	from utilities import read_text_row,wrap_mpi_bcast,even_angles
 	from applications import MPI_start_end
+	import numpy
 	myid      = Tracker["constants"]["myid"]
 	main_node = Tracker["constants"]["main_node"]
 	nproc     = Tracker["constants"]["nproc"]
@@ -6525,51 +6474,62 @@ def get_stat_proj(Tracker,delta,this_ali3d):
 	image_start, image_end = MPI_start_end(ndata, nproc, myid)
 	ali3d_params=ali3d_params[image_start:image_end]
 	sampled=counting_projections(delta,ali3d_params,image_start)
-	for inode in range(nproc):
-		if myid ==inode:
-			dlist=unload_dict(sampled)
-		else:
-			dlist =0
-		dlist=wrap_mpi_bcast(dlist,inode)
-		if myid ==main_node and inode != main_node:
-			sampled=load_dict(sampled,dlist)
-		mpi_barrier(MPI_COMM_WORLD)
+	#  Collect every rank's contribution with two gathers of raw int32
+	#  buffers instead of a pickled broadcast per node.  Every particle
+	#  falls into exactly one direction, so each rank ships as many ids
+	#  as it owns and the counts/displacements are known on all ranks.
+	counts, ids    = unload_dict(sampled)
+	nbins          = len(counts)
+	recvcount_bins = [nbins]*nproc
+	disps_bins     = [nbins*ip for ip in range(nproc)]
+	recvcount_ids  = []
+	disps_ids      = []
+	for ip in range(nproc):
+		ib, ie = MPI_start_end(ndata, nproc, ip)
+		recvcount_ids.append(ie-ib)
+		disps_ids.append(ib)
+	all_counts = mpi_gatherv(counts, nbins,     MPI_INT, recvcount_bins, disps_bins, MPI_INT, main_node, mpi_comm)
+	all_ids    = mpi_gatherv(ids,    len(ids),  MPI_INT, recvcount_ids,  disps_ids,  MPI_INT, main_node, mpi_comm)
+	if myid ==main_node:
+		sampled = load_dict(sampled, all_counts, all_ids, nproc)
 	return sampled
 
 def create_random_list(Tracker):
-	import copy
-	import random
-	from utilities import wrap_mpi_bcast
+	import numpy
+	from mpi import mpi_bcast, MPI_INT, MPI_COMM_WORLD
 
 	myid        = Tracker["constants"]["myid"]
 	main_node   = Tracker["constants"]["main_node"]
 	total_stack = Tracker["total_stack"]
 
-	if Tracker["constants"]["seed"] ==- 1: random.seed()
-	else:                                  random.seed(Tracker["constants"]["seed"])
+	if Tracker["constants"]["seed"] ==- 1: numpy.random.seed()
+	else:                                  numpy.random.seed(Tracker["constants"]["seed"])
 
+	#  permute an int32 array in C and broadcast the raw buffer
+	#  instead of shuffling and pickling a python list per run
+	base        = numpy.asarray(Tracker["this_data_list"], dtype = numpy.int32)
+	nll         = len(base)
 	indep_list  = []
 	for irandom in range(Tracker["constants"]["indep_runs"]):
-		ll = copy.copy(Tracker["this_data_list"])
-		random.shuffle(ll)
-		ll = wrap_mpi_bcast(ll, main_node)
-		indep_list.append(ll)
+		if myid == main_node:  ll = numpy.random.permutation(base)
+		else:                  ll = base
+		ll = mpi_bcast(ll, nll, MPI_INT, main_node, MPI_COMM_WORLD)
+		indep_list.append(list(map(int, ll)))
 	Tracker["this_indep_list"] = indep_list
 
-def get_number_of_groups(total_particles,number_of_images_per_group, round_off=.2):
-	number_of_groups=float(total_particles)/number_of_images_per_group
-	if number_of_groups - int(number_of_groups)<round_off:
-		number_of_groups = int(number_of_groups)
-	else:
-		number_of_groups = int(number_of_groups)+1
-	return number_of_groups
+def get_number_of_groups(total_particles,number_of_images_per_group, round_off=.4):
+	# the default round_off matches the duplicate definition that used to
+	# shadow this one, so every caller keeps its current group count
+	q, r = divmod(total_particles, number_of_images_per_group)
+	if r >= round_off*number_of_images_per_group:  q += 1
+	return q
 
 def recons_mref(Tracker):
-	from mpi import mpi_barrier, MPI_COMM_WORLD
+	from mpi import mpi_barrier, mpi_comm_split, mpi_comm_rank, mpi_comm_size, MPI_COMM_WORLD
 	import os
 	from time import sleep
 	from reconstruction import recons3d_4nn_ctf_MPI
-	from utilities import get_shrink_data_huang
+	from utilities import get_shrink_data_huang, write_text_file
 	myid             = Tracker["constants"]["myid"]
 	main_node        = Tracker["constants"]["main_node"]
 	nproc            = Tracker["constants"]["nproc"]
@@ -6580,92 +6540,118 @@ def recons_mref(Tracker):
 	total_data       = len(particle_list)
 	ref_list = []
 	number_of_ref_class = []
+	group_data_lists = []
+	group_list_files = []
 	for igrp in range(number_of_groups):
 		a_group_list = particle_list[(total_data*igrp)//number_of_groups:(total_data*(igrp+1))//number_of_groups]
 		a_group_list.sort()
-		Tracker["this_data_list"] = a_group_list
-		from utilities import write_text_file
 		particle_list_file = os.path.join(Tracker["this_dir"], "iclass%d.txt"%igrp)
 		if myid ==main_node:
-			write_text_file(Tracker["this_data_list"],particle_list_file)
-		mpi_barrier(MPI_COMM_WORLD)
-		data, old_shifts =  get_shrink_data_huang(Tracker,nxinit,particle_list_file,partstack,myid,main_node,nproc,preshift=True)
-		#vol=reconstruct_3D(Tracker,data)
+			write_text_file(a_group_list,particle_list_file)
+		group_data_lists.append(a_group_list)
+		group_list_files.append(particle_list_file)
+		number_of_ref_class.append(len(a_group_list))
+	mpi_barrier(MPI_COMM_WORLD)
+	if( number_of_groups > 1 and nproc >= 2*number_of_groups and main_node == 0 ):
+		#  Enough ranks: split MPI_COMM_WORLD into one sub-communicator per group
+		#  and reconstruct all volumes concurrently instead of one after another.
+		starts = [old_div(nproc*igrp, number_of_groups) for igrp in range(number_of_groups+1)]
+		for igrp in range(number_of_groups):
+			if( starts[igrp] <= myid and myid < starts[igrp+1] ):  color = igrp
+		sub_comm  = mpi_comm_split(MPI_COMM_WORLD, color, myid)
+		sub_myid  = mpi_comm_rank(sub_comm)
+		sub_nproc = mpi_comm_size(sub_comm)
+		Tracker["this_data_list"] = group_data_lists[color]
+		data, old_shifts = get_shrink_data_huang(Tracker, nxinit, group_list_files[color], partstack, sub_myid, 0, sub_nproc, preshift = True, mpi_comm = sub_comm)
+		vol = recons3d_4nn_ctf_MPI(myid=sub_myid, prjlist=data, symmetry=Tracker["constants"]["sym"], finfo=None, mpi_comm=sub_comm)
 		mpi_barrier(MPI_COMM_WORLD)
-		vol = recons3d_4nn_ctf_MPI(myid=myid,prjlist=data,symmetry=Tracker["constants"]["sym"],finfo=None)
+		#  Each sub-communicator root holds its group volume; collect them on main_node
+		from utilities import send_EMData, recv_EMData, model_blank
+		for igrp in range(number_of_groups):
+			if( myid == main_node ):
+				if( starts[igrp] == main_node ): ref_list.append(vol)
+				else:                            ref_list.append(recv_EMData(starts[igrp], igrp))
+			else:
+				if( myid == starts[igrp] ): send_EMData(vol, main_node, igrp)
+				ref_list.append(model_blank(nxinit, nxinit, nxinit))
+			mpi_barrier(MPI_COMM_WORLD)
+		Tracker["this_data_list"] = group_data_lists[-1]  # same final state as the serial loop
 		if myid ==main_node:
-			print("reconstructed %3d"%igrp)
-		ref_list.append(vol)
-		number_of_ref_class.append(len(Tracker["this_data_list"]))
+			print("reconstructed %3d groups over sub-communicators"%number_of_groups)
+	else:
+		for igrp in range(number_of_groups):
+			Tracker["this_data_list"] = group_data_lists[igrp]
+			data, old_shifts =  get_shrink_data_huang(Tracker,nxinit,group_list_files[igrp],partstack,myid,main_node,nproc,preshift=True)
+			#vol=reconstruct_3D(Tracker,data)
+			mpi_barrier(MPI_COMM_WORLD)
+			vol = recons3d_4nn_ctf_MPI(myid=myid,prjlist=data,symmetry=Tracker["constants"]["sym"],finfo=None)
+			if myid ==main_node:
+				print("reconstructed %3d"%igrp)
+			ref_list.append(vol)
 	Tracker["number_of_ref_class"] = number_of_ref_class
 	return ref_list
 
-def apply_low_pass_filter(refvol,Tracker):
+def apply_low_pass_filter(refvol,Tracker, shared = False):
+	#  With shared True the volumes are identical on all ranks, so each rank
+	#  filters a stride of the list and the owners rebroadcast the results;
+	#  otherwise every rank filters its own copies as before.
 	from filter import filt_tanl
-	for iref in range(len(refvol)):
-		refvol[iref]=filt_tanl(refvol[iref],Tracker["low_pass_filter"],.1)
+	if shared:
+		from utilities import bcast_EMData_to_all
+		myid  = Tracker["constants"]["myid"]
+		nproc = Tracker["constants"]["nproc"]
+		for iref in range(len(refvol)):
+			if( iref % nproc == myid ):  refvol[iref] = filt_tanl(refvol[iref],Tracker["low_pass_filter"],.1)
+		for iref in range(len(refvol)):
+			bcast_EMData_to_all(refvol[iref], myid, iref % nproc)
+	else:
+		for iref in range(len(refvol)):
+			refvol[iref]=filt_tanl(refvol[iref],Tracker["low_pass_filter"],.1)
 	return refvol
 
 def get_groups_from_partition(partition, initial_ID_list, number_of_groups):
-	# sort out Kmref results to individual groups that has initial IDs
-	# make a dictionary
-	dict = {}
-	for iptl in range(len(initial_ID_list)):
-		dict[iptl] = initial_ID_list[iptl]
-	res = []
-	for igrp in range(number_of_groups):
-		class_one = []
-		for ipt in range(len(partition)):
-			if partition[ipt] == igrp:
-				orginal_id = dict[ipt]
-				class_one.append(orginal_id)
-		res.append(class_one)
-	return res
-
-def get_number_of_groups(total_particles,number_of_images_per_group):
-	# soft partition groups
-	number_of_groups=float(total_particles)/number_of_images_per_group
-	if number_of_groups - int(number_of_groups)<.4:
-		number_of_groups = int(number_of_groups)
-	else:
-		number_of_groups = int(number_of_groups)+1
-	return number_of_groups
+	# sort out Kmref results to individual groups that has initial IDs;
+	# one stable sort by group label replaces a scan of the partition per group
+	import numpy
+	parr  = numpy.asarray(partition, dtype = numpy.int32)
+	ids   = numpy.asarray(initial_ID_list)
+	order = numpy.argsort(parr, kind = "stable")
+	edges = numpy.searchsorted(parr[order], numpy.arange(number_of_groups+1))
+	sorted_ids = ids[order]
+	return [sorted_ids[edges[igrp]:edges[igrp+1]].tolist() for igrp in range(number_of_groups)]
 
 def get_complementary_elements(total_list,sub_data_list):
+	import numpy
 	if len(total_list)<len(sub_data_list):
 		print("Wrong input list!")
 		return []
 	else:
-		sub_data_dict     = {}
-		complementary     = []
-		for index in range(len(sub_data_list)):sub_data_dict[sub_data_list[index]]=index
-		for any in total_list:
-			if (any in sub_data_dict) is False:complementary.append(any)
-		return complementary
+		# boolean mask keeps the order of total_list, as the dict probing did
+		tarr = numpy.asarray(total_list)
+		return tarr[~numpy.isin(tarr, numpy.asarray(sub_data_list))].tolist()
 
 def get_complementary_elements_total(total_stack, data_list):
-	data_dict    ={}
-	complementary     = []
-	for index in range(len(data_list)):data_dict[data_list[index]]=index
-	for index in range(total_stack):
-		if (index in data_dict) is False:complementary.append(index)
-	return complementary
+	import numpy
+	return numpy.setdiff1d(numpy.arange(total_stack), numpy.asarray(data_list)).tolist()
 
 def update_full_dict(leftover_list, Tracker):
-	full_dict = {}
-	for iptl in range(len(leftover_list)):
-		full_dict[iptl]     = leftover_list[iptl]
-	Tracker["full_ID_dict"] = full_dict
+	import numpy
+	# keys are always 0..N-1, so a dense int64 array replaces the dict;
+	# much smaller and allows fancy indexing in get_initial_ID
+	Tracker["full_ID_dict"] = numpy.asarray(leftover_list, dtype = numpy.int64)
 
 def count_chunk_members(chunk_dict, one_class):
-	N_chunk0 = 0
-	N_chunk1 = 0
-	for a in one_class:
-		if chunk_dict[a] == 0: N_chunk0 += 1
-		else:                  N_chunk1 += 1
+	import numpy
 	n = len(one_class)
 	if n <=1:  return 0.0, 0.0, n
-	else: return  float(N_chunk0)/n, float(N_chunk1)/n, n
+	if isinstance(chunk_dict, numpy.ndarray):
+		# dense chunk table: one fancy-indexed gather
+		flags = chunk_dict[numpy.asarray(one_class, dtype = numpy.int64)]
+	else:
+		flags = numpy.fromiter((chunk_dict[a] for a in one_class), dtype = numpy.int8, count = n)
+	N_chunk1 = int((flags != 0).sum())
+	N_chunk0 = n - N_chunk1
+	return  float(N_chunk0)/n, float(N_chunk1)/n, n
 
 def get_two_chunks_from_stack(Tracker):
 	total_chunk = EMUtil.get_all_attributes(Tracker["orgstack"],"chunk_id")
@@ -6676,6 +6662,21 @@ def get_two_chunks_from_stack(Tracker):
 		else:chunk_two.append(index_of_total_chunk)
 	return chunk_one, chunk_two
 
+def adjust_fsc_down(fsc, n1, n2):
+	"""
+	  Rescale an fsc curve computed from n1 particles to the level expected
+	  from a subset of n2 particles; the SSNR scales with the particle count,
+	  so fsc' = r*fsc/(1-(1-r)*fsc) with r = n2/n1, applied to all bins at once.
+	"""
+	import numpy
+	if isinstance(fsc, str):
+		from utilities import read_text_file
+		fsc = read_text_file(fsc, -1)
+	r  = old_div(float(n2), float(n1))
+	f1 = numpy.asarray(fsc[1], dtype = numpy.float64)
+	adjusted = old_div(r*f1, 1.0 - (1.0-r)*f1)
+	return [fsc[0], adjusted.tolist()] + [fsc[i] for i in range(2, len(fsc))]
+
 def set_filter_parameters_from_adjusted_fsc(n1,n2,Tracker):
 	fsc_cutoff   = 1.0/3.0
 	adjusted_fsc = adjust_fsc_down(Tracker["global_fsc"],n1,n2)
@@ -6719,32 +6720,19 @@ def get_class_members(sort3d_dir):
 	return class_list
 
 def remove_small_groups(class_list,minimum_number_of_objects_in_a_group):
-	new_class  = []
-	final_list = []
-	for one_class in class_list:
-		if len(one_class)>=minimum_number_of_objects_in_a_group:
-			new_class.append(one_class)
-			for element in one_class:
-				final_list.append(element)
-	final_list.sort()
+	from itertools import chain
+	new_class  = [one_class for one_class in class_list if len(one_class)>=minimum_number_of_objects_in_a_group]
+	final_list = sorted(chain.from_iterable(new_class))
 	return final_list, new_class
 
-def get_number_of_groups(total_particles,number_of_images_per_group):
-	#minimum_number_of_members = 1000
-	number_of_groups   =  float(total_particles)/number_of_images_per_group
-	if number_of_groups - int(number_of_groups)<.4:number_of_groups = int(number_of_groups)
-	else:number_of_groups = int(number_of_groups)+1
-	return number_of_groups
-
 def get_stable_members_from_two_runs(SORT3D_rootdirs, ad_hoc_number, log_main):
 	#SORT3D_rootdirs                       =sys.argv[1]
 	# ad_hoc_number would be a number larger than the id simply for handling two_way comparison of non-equal number of groups from two partitions.
 	########
-	from string import split
 	from pap_statistics import k_means_match_clusters_asg_new
 	from numpy import array
 
-	sort3d_rootdir_list = split(SORT3D_rootdirs)
+	sort3d_rootdir_list = SORT3D_rootdirs.split()
 	dict1              = []
 	maximum_elements   = 0
 	for index_sort3d in range(len(sort3d_rootdir_list)):